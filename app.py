@@ -3,14 +3,19 @@ app.py
 Streamlit chat UI refactored for clarity and functional structure.
 """
 import os
-import uuid
+import secrets
+import time
 from datetime import datetime, timezone
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import streamlit as st
 from dotenv import load_dotenv
 
-from chat_history_manager import ChatHistoryManager
+from chat_history_manager import (
+    DEFAULT_PG_MAX_CONNECTIONS,
+    MAX_TITLE_CHARS,
+    ChatHistoryManager,
+)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -21,8 +26,48 @@ load_dotenv()
 st.set_page_config(page_title="ChatGPT-like UI", page_icon="💬", layout="wide")
 
 DEFAULT_MODEL = "gpt-4o-mini"
+# Available model identifiers for the dropdown, with a precomputed index lookup
+MODELS = (
+    "gpt-4o-mini",
+    "gpt-4o",
+    "gpt-4.1",
+    "gpt-3.5-turbo",
+    "local-llm",
+)
+MODEL_INDEX = {model: i for i, model in enumerate(MODELS)}
+# Sidebar chats rendered per "Load older" page
+CHAT_PAGE_SIZE = 25
+# Transcript messages rendered per "Load earlier" page
+TRANSCRIPT_PAGE_SIZE = 50
+
 WELCOME_TITLE = "DAPE OpsAgent Manager"
 WELCOME_SUBTITLE = "What can I do for you?"
+WELCOME_HTML = f"""
+    <div style="display: flex; flex-direction: column; align-items: center; justify-content: center; height: 60vh;">
+        <h1 style="text-align: center; margin-bottom: 1rem;">{WELCOME_TITLE}</h1>
+        <p style="text-align: center; font-size: 1.2rem; color: #666;">{WELCOME_SUBTITLE}</p>
+    </div>
+"""
+# Line breaks and tabs become spaces so titles stay on a single line
+TITLE_WHITESPACE = str.maketrans({"\n": " ", "\r": " ", "\t": " "})
+
+# Page styles, emitted by inject_css() on every rerun (Streamlit drops
+# elements that a rerun does not re-emit, so this cannot be skipped)
+CSS = """
+<style>
+section[data-testid="stSidebar"] .block-container { padding-top: 1rem; }
+.main .block-container { max-width: 900px; }
+[data-testid="stChatMessage"] > div { border-radius: 12px !important; }
+.sticky-header { position: sticky; top: 0; z-index: 999; padding: .5rem .8rem; margin: -1rem -1rem 0 -1rem; background: rgba(250,250,250,.85); backdrop-filter: blur(6px); border-bottom: 1px solid #eee; }
+.chat-item { position: relative; padding: 0.5rem; border-radius: 8px; margin-bottom: 0.25rem; transition: background-color 0.2s; }
+.chat-item:hover { background-color: rgba(0,0,0,0.05); }
+.chat-item-content { display: flex; align-items: center; justify-content: space-between; }
+.chat-menu-btn { opacity: 0; transition: opacity 0.2s; cursor: pointer; padding: 4px 8px; border-radius: 4px; font-size: 16px; }
+.chat-item:hover .chat-menu-btn { opacity: 1; }
+.chat-menu-btn:hover { background-color: rgba(0,0,0,0.1); }
+.chat-row { position: relative; }
+</style>
+"""
 
 
 # ----------------------------------------------------------------------------
@@ -31,51 +76,66 @@ WELCOME_SUBTITLE = "What can I do for you?"
 # Initialize chat history manager based on environment configuration
 CHAT_HISTORY_MODE = os.getenv("CHAT_HISTORY_MODE", "local")
 CONVERSATION_HISTORY_DAYS = int(os.getenv("CONVERSATION_HISTORY_DAYS", "7"))
+POSTGRES_DRIVER = os.getenv("POSTGRES_DRIVER", "psycopg2")
+POSTGRES_MAX_CONNECTIONS = int(os.getenv("POSTGRES_MAX_CONNECTIONS", str(DEFAULT_PG_MAX_CONNECTIONS)))
+
+
+@st.cache_resource
+def get_history_manager() -> ChatHistoryManager:
+    """Build the chat history manager once per process and share it across sessions."""
+    if CHAT_HISTORY_MODE in ["redis", "local_redis"]:
+        # Build PostgreSQL connection string from environment variables
+        host = os.getenv("POSTGRES_HOST", "localhost")
+        port = os.getenv("POSTGRES_PORT", "5432")
+        user = os.getenv("POSTGRES_ADMIN_LOGIN", "pgadmin")
+        password = os.getenv("POSTGRES_ADMIN_PASSWORD", "")
+        database = os.getenv("POSTGRES_DATABASE", "chat_history")
+        sslmode = os.getenv("POSTGRES_SSLMODE", "require")
+        connection_string = f"postgresql://{user}:{password}@{host}:{port}/{database}?sslmode={sslmode}"
+
+        # Build Redis connection parameters
+        redis_host = os.getenv("REDIS_HOST", "localhost")
+        redis_password = os.getenv("REDIS_PASSWORD", "")
+        redis_port = int(os.getenv("REDIS_PORT", "6380"))
+        redis_ssl = os.getenv("REDIS_SSL", "true").lower() == "true"
+        redis_ttl = int(os.getenv("REDIS_TTL_SECONDS", "1800"))
+
+        return ChatHistoryManager(
+            mode="redis",
+            connection_string=connection_string,
+            redis_host=redis_host,
+            redis_password=redis_password,
+            redis_port=redis_port,
+            redis_ssl=redis_ssl,
+            redis_ttl=redis_ttl,
+            history_days=CONVERSATION_HISTORY_DAYS,
+            pg_driver=POSTGRES_DRIVER,
+            pg_max_connections=POSTGRES_MAX_CONNECTIONS,
+        )
+    elif CHAT_HISTORY_MODE == "postgres" or CHAT_HISTORY_MODE == "local_psql":
+        # Build PostgreSQL connection string from environment variables
+        host = os.getenv("POSTGRES_HOST", "localhost")
+        port = os.getenv("POSTGRES_PORT", "5432")
+        user = os.getenv("POSTGRES_ADMIN_LOGIN", "pgadmin")
+        password = os.getenv("POSTGRES_ADMIN_PASSWORD", "")
+        database = os.getenv("POSTGRES_DATABASE", "chat_history")
+        sslmode = os.getenv("POSTGRES_SSLMODE", "require")
+        connection_string = f"postgresql://{user}:{password}@{host}:{port}/{database}?sslmode={sslmode}"
+
+        return ChatHistoryManager(
+            mode="postgres",
+            connection_string=connection_string,
+            history_days=CONVERSATION_HISTORY_DAYS,
+            pg_driver=POSTGRES_DRIVER,
+            pg_max_connections=POSTGRES_MAX_CONNECTIONS,
+        )
+    else:
+        return ChatHistoryManager(mode="local")
+
+
+HISTORY = get_history_manager()
+
 
-if CHAT_HISTORY_MODE in ["redis", "local_redis"]:
-    # Build PostgreSQL connection string from environment variables
-    host = os.getenv("POSTGRES_HOST", "localhost")
-    port = os.getenv("POSTGRES_PORT", "5432")
-    user = os.getenv("POSTGRES_ADMIN_LOGIN", "pgadmin")
-    password = os.getenv("POSTGRES_ADMIN_PASSWORD", "")
-    database = os.getenv("POSTGRES_DATABASE", "chat_history")
-    sslmode = os.getenv("POSTGRES_SSLMODE", "require")
-    connection_string = f"postgresql://{user}:{password}@{host}:{port}/{database}?sslmode={sslmode}"
-
-    # Build Redis connection parameters
-    redis_host = os.getenv("REDIS_HOST", "localhost")
-    redis_password = os.getenv("REDIS_PASSWORD", "")
-    redis_port = int(os.getenv("REDIS_PORT", "6380"))
-    redis_ssl = os.getenv("REDIS_SSL", "true").lower() == "true"
-    redis_ttl = int(os.getenv("REDIS_TTL_SECONDS", "1800"))
-
-    HISTORY = ChatHistoryManager(
-        mode="redis",
-        connection_string=connection_string,
-        redis_host=redis_host,
-        redis_password=redis_password,
-        redis_port=redis_port,
-        redis_ssl=redis_ssl,
-        redis_ttl=redis_ttl,
-        history_days=CONVERSATION_HISTORY_DAYS
-    )
-elif CHAT_HISTORY_MODE == "postgres" or CHAT_HISTORY_MODE == "local_psql":
-    # Build PostgreSQL connection string from environment variables
-    host = os.getenv("POSTGRES_HOST", "localhost")
-    port = os.getenv("POSTGRES_PORT", "5432")
-    user = os.getenv("POSTGRES_ADMIN_LOGIN", "pgadmin")
-    password = os.getenv("POSTGRES_ADMIN_PASSWORD", "")
-    database = os.getenv("POSTGRES_DATABASE", "chat_history")
-    sslmode = os.getenv("POSTGRES_SSLMODE", "require")
-    connection_string = f"postgresql://{user}:{password}@{host}:{port}/{database}?sslmode={sslmode}"
-
-    HISTORY = ChatHistoryManager(
-        mode="postgres",
-        connection_string=connection_string,
-        history_days=CONVERSATION_HISTORY_DAYS
-    )
-else:
-    HISTORY = ChatHistoryManager(mode="local")
 
 def get_user_info() -> Dict[str, str]:
     """Extract user information from SSO headers or environment config.
@@ -129,23 +189,20 @@ def ensure_state() -> None:
         st.session_state.user_info = get_user_info()
 
     if "conversations" not in st.session_state:
-        st.session_state.conversations = {}
-        # Load from persistent storage
+        # Load metadata only; messages stay None until the chat is opened.
+        # The dict is kept oldest -> newest so recency updates are a move-to-end.
         user_id = st.session_state.user_info.get('user_id')
-        for cid, convo in HISTORY.list_conversations(user_id=user_id):
-            st.session_state.conversations[cid] = convo
-
-    if "current_id" not in st.session_state or st.session_state.current_id not in st.session_state.conversations:
-        # Prefer reusing an existing clean chat (no messages) to avoid duplicates
-        empty_chats = [
-            (cid, convo)
-            for cid, convo in st.session_state.conversations.items()
-            if not convo.get("messages")
-        ]
-        if empty_chats:
-            # Pick the newest empty chat by created_at
-            empty_chats.sort(key=lambda kv: kv[1].get("created_at", ""), reverse=True)
-            st.session_state.current_id = empty_chats[0][0]
+        st.session_state.conversations = {
+            cid: {**meta, "messages": None}
+            for cid, meta in reversed(HISTORY.list_conversation_metas(user_id=user_id))
+        }
+
+    conversations = st.session_state.conversations
+    if "current_id" not in st.session_state or st.session_state.current_id not in conversations:
+        # Prefer reusing this session's clean chat (no messages) to avoid duplicates
+        empty_id = st.session_state.get("empty_chat_id")
+        if empty_id in conversations:
+            st.session_state.current_id = empty_id
         else:
             # No clean chat available; create a fresh one to show welcome page
             new_chat()
@@ -154,68 +211,115 @@ def ensure_state() -> None:
         st.session_state.show_menu = None
     if "renaming_chat" not in st.session_state:
         st.session_state.renaming_chat = None
+    if "chat_page" not in st.session_state:
+        st.session_state.chat_page = 0
+    if "write_errors_shown" not in st.session_state:
+        st.session_state.write_errors_shown = {}
+    if "llm_messages" not in st.session_state:
+        st.session_state.llm_messages = {}
+    if "transcript_window" not in st.session_state:
+        st.session_state.transcript_window = {}
     if "selected_model" not in st.session_state:
         st.session_state.selected_model = DEFAULT_MODEL
 
 
+def new_conversation_id() -> str:
+    """Return a time-ordered conversation ID (ULID-style).
+
+    48-bit millisecond timestamp plus 16 random bits, as 16 hex chars. IDs sort
+    lexically by creation time, so database primary-key inserts land at the
+    right edge of the index instead of at random pages.
+    """
+    return f"{time.time_ns() // 1_000_000:012x}{secrets.token_hex(2)}"
+
+
 def new_chat() -> None:
-    """Create a new conversation, set it as current, and timestamp it."""
-    cid = str(uuid.uuid4())[:8]
+    """Create a new in-session conversation, set it as current, and timestamp it."""
+    cid = new_conversation_id()
+    now = datetime.now(timezone.utc).isoformat()
     st.session_state.conversations[cid] = {
         "title": "New chat",
         "model": st.session_state.get("selected_model", DEFAULT_MODEL),
         "messages": [],
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "last_modified": datetime.now(timezone.utc).isoformat(),
+        "created_at": now,
+        "last_modified": now,
     }
+    st.session_state.conv_order_dirty = True
     st.session_state.current_id = cid
-    user_id = st.session_state.user_info.get('user_id')
-    HISTORY.save_conversation(cid, st.session_state.conversations[cid], user_id=user_id)
+    # Not persisted until its first message; empty chats live only in this session
+    st.session_state.empty_chat_id = cid
+
+
+def load_messages(cid: str) -> Dict:
+    """Fetch a conversation's messages on first access and return the conversation."""
+    convo = st.session_state.conversations[cid]
+    if convo["messages"] is None:
+        user_id = st.session_state.user_info.get('user_id')
+        full_convo = HISTORY.get_conversation(cid, user_id=user_id)
+        convo["messages"] = full_convo["messages"] if full_convo else []
+    return convo
+
+
+def evict_messages(cid: str) -> None:
+    """Release a conversation's loaded messages; load_messages() refetches them on demand."""
+    convo = st.session_state.conversations.get(cid)
+    # An empty chat (e.g. the unsaved new chat) frees nothing, and refetching
+    # it would only cost a storage round trip for the same empty list
+    if convo is not None and convo["messages"]:
+        convo["messages"] = None
+    st.session_state.llm_messages.pop(cid, None)
+    st.session_state.transcript_window.pop(cid, None)
 
 
 def title_from_first_user_message(msg: str) -> str:
     """Derive a short, single-line chat title from the user's first message."""
-    trimmed = (msg or "New chat").strip().replace("\n", " ")
-    return (trimmed[:28] + "…") if len(trimmed) > 29 else (trimmed if trimmed else "New chat")
-
-
-def models_list() -> List[str]:
-    """Return available model identifiers for the dropdown."""
-    return [
-        "gpt-4o-mini",
-        "gpt-4o",
-        "gpt-4.1",
-        "gpt-3.5-turbo",
-        "local-llm",
-    ]
-
-
-def call_llm_stub(model: str, messages: List[Dict]) -> str:
-    """Placeholder LLM: echo the user's last message for the chosen model."""
-    user_last = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "Hello!")
-    return f"(Stubbed {model}) You said: {user_last}"
-
-
-def get_conversations_sorted() -> List[Tuple[str, Dict]]:
-    """Return (id, conversation) tuples sorted by last_modified, fallback created_at (desc)."""
-    items = [
-        (cid, convo)
-        for cid, convo in st.session_state.conversations.items()
-    ]
-    return sorted(
-        items,
-        key=lambda x: x[1].get("last_modified", x[1].get("created_at", "")),
-        reverse=True,
-    )
+    # Titles cap at 29 chars, so only the head of a long message is examined
+    head = (msg or "New chat").lstrip()[:64].translate(TITLE_WHITESPACE).strip()
+    return (head[:28] + "…") if len(head) > 29 else (head or "New chat")
+
+
+def call_llm_stub(model: str, messages: List[Dict], user_last: str) -> str:
+    """Placeholder LLM: echo the user's last message for the chosen model.
+
+    The caller passes the prompt it just appended as user_last, so the
+    message history never has to be scanned for it.
+    """
+    return f"(Stubbed {model}) You said: {user_last or 'Hello!'}"
+
+
+def touch_conversation(cid: str) -> None:
+    """Move a conversation to the newest end of the recency-ordered conversations dict."""
+    conversations = st.session_state.conversations
+    if next(reversed(conversations)) != cid:
+        conversations[cid] = conversations.pop(cid)
+        st.session_state.conv_order_dirty = True
+
+
+def get_conversations_sorted(limit: Optional[int] = None) -> List[Tuple[str, Dict]]:
+    """Return (id, conversation) tuples newest first, optionally only the newest `limit`.
+
+    The conversations dict is maintained in last_modified order (see
+    ensure_state/touch_conversation), so this is a reverse walk, not a sort.
+    The cid order is cached until a chat is created, deleted, or reordered.
+    """
+    conversations = st.session_state.conversations
+    if st.session_state.get("conv_order_dirty", True):
+        st.session_state.conv_order = list(reversed(conversations))
+        st.session_state.conv_order_dirty = False
+    return [(cid, conversations[cid]) for cid in st.session_state.conv_order[:limit]]
 
 
 def sync_selected_model_to_current() -> None:
     """Copy the selected model into the active conversation record without updating last_modified."""
-    convo = st.session_state.conversations[st.session_state.current_id]
-    if convo.get("model") != st.session_state.selected_model:
-        convo["model"] = st.session_state.selected_model
+    cid = st.session_state.current_id
+    model = st.session_state.selected_model
+    convo = st.session_state.conversations[cid]
+    if convo.get("model") != model:
+        convo["model"] = model
+        if cid == st.session_state.get("empty_chat_id"):
+            return  # saved with its first message
         user_id = st.session_state.user_info.get('user_id')
-        HISTORY.save_conversation(st.session_state.current_id, convo, user_id=user_id)
+        HISTORY.queue_metadata_save(cid, convo, user_id=user_id)
 
 
 # ----------------------------------------------------------------------------
@@ -223,107 +327,133 @@ def sync_selected_model_to_current() -> None:
 # ----------------------------------------------------------------------------
 def inject_css() -> None:
     """Inject small CSS tweaks for layout, spacing, and subtle styling."""
-    st.markdown(
-        """
-<style>
-section[data-testid="stSidebar"] .block-container { padding-top: 1rem; }
-.main .block-container { max-width: 900px; }
-[data-testid="stChatMessage"] > div { border-radius: 12px !important; }
-.sticky-header { position: sticky; top: 0; z-index: 999; padding: .5rem .8rem; margin: -1rem -1rem 0 -1rem; background: rgba(250,250,250,.85); backdrop-filter: blur(6px); border-bottom: 1px solid #eee; }
-.chat-item { position: relative; padding: 0.5rem; border-radius: 8px; margin-bottom: 0.25rem; transition: background-color 0.2s; }
-.chat-item:hover { background-color: rgba(0,0,0,0.05); }
-.chat-item-content { display: flex; align-items: center; justify-content: space-between; }
-.chat-menu-btn { opacity: 0; transition: opacity 0.2s; cursor: pointer; padding: 4px 8px; border-radius: 4px; font-size: 16px; }
-.chat-item:hover .chat-menu-btn { opacity: 1; }
-.chat-menu-btn:hover { background-color: rgba(0,0,0,0.1); }
-.chat-row { position: relative; }
-</style>
-""",
-        unsafe_allow_html=True,
-    )
+    st.markdown(CSS, unsafe_allow_html=True)
 
 
 def render_model_picker() -> None:
     """Render the model selector and sync selection to session state."""
     st.markdown("### 🤖 Model")
-    st.session_state.selected_model = st.selectbox(
+    current = st.session_state.get("selected_model", DEFAULT_MODEL)
+    chosen = st.selectbox(
         "Choose a model",
-        models_list(),
-        index=models_list().index(st.session_state.get("selected_model", DEFAULT_MODEL)) if st.session_state.get("selected_model") in models_list() else 0,
+        MODELS,
+        index=MODEL_INDEX.get(current, 0),
         label_visibility="collapsed",
     )
+    if chosen != current:
+        st.session_state.selected_model = chosen
+
+
+def toggle_chat_menu(cid: str) -> None:
+    """Open or close the options menu for a chat."""
+    st.session_state.show_menu = None if st.session_state.show_menu == cid else cid
+
+
+def start_rename(cid: str) -> None:
+    """Switch a chat's row into rename mode."""
+    st.session_state.renaming_chat = cid
+    st.session_state.show_menu = None
+
+
+def save_rename(cid: str) -> None:
+    """Apply the entered title and persist it in the background."""
+    new_title = st.session_state.get(f"rename_input_{cid}", "").strip()[:MAX_TITLE_CHARS]
+    if new_title:
+        convo = st.session_state.conversations[cid]
+        convo["title"] = new_title
+        if cid != st.session_state.get("empty_chat_id"):
+            user_id = st.session_state.user_info.get('user_id')
+            HISTORY.queue_metadata_save(cid, convo, user_id=user_id)
+    st.session_state.renaming_chat = None
+
 
+def cancel_rename() -> None:
+    """Leave rename mode without changes."""
+    st.session_state.renaming_chat = None
 
+
+def load_older_chats() -> None:
+    """Show one more page of chats in the sidebar."""
+    st.session_state.chat_page += 1
+
+
+@st.fragment
 def render_chat_items() -> None:
-    """Render chat list with select, rename, and delete controls."""
+    """Render chat list with select, rename, and delete controls.
+
+    Runs as a fragment: menu and rename controls use on_click callbacks and
+    rerun only the list; selecting or deleting a chat reruns the whole app.
+    Only the active chat gets the options menu, which keeps every other row
+    down to one button. Chats are paged CHAT_PAGE_SIZE at a time.
+    """
+    conversations = st.session_state.conversations
     current = st.session_state.current_id
-    items = get_conversations_sorted()
+    renaming = st.session_state.renaming_chat
+    visible = (st.session_state.chat_page + 1) * CHAT_PAGE_SIZE
+    items = get_conversations_sorted(limit=visible)
     if not items:
         st.info("No chats yet. Start one!")
         return
+    if all(cid != current for cid, _ in items) and current in conversations:
+        # Keep the active chat reachable even when it is older than the loaded pages
+        items.append((current, conversations[current]))
 
     for cid, convo in items:
         title = convo["title"]
-        if st.session_state.renaming_chat == cid:
+        if renaming == cid:
             st.markdown("**Rename chat**")
-            new_title = st.text_input(
-                "New name",
-                value=st.session_state.conversations[cid]["title"],
-                key=f"rename_input_{cid}",
-                label_visibility="collapsed",
-            )
-            col_save, col_cancel = st.columns([1, 1])
-            with col_save:
-                if st.button("💾 Save", key=f"save_{cid}", use_container_width=True):
-                    if new_title.strip():
-                        st.session_state.conversations[cid]["title"] = new_title.strip()
-                        user_id = st.session_state.user_info.get('user_id')
-                        HISTORY.save_conversation(cid, st.session_state.conversations[cid], user_id=user_id)
-                    st.session_state.renaming_chat = None
-                    st.rerun()
-            with col_cancel:
-                if st.button("✗ Cancel", key=f"cancel_{cid}", use_container_width=True):
-                    st.session_state.renaming_chat = None
-                    st.rerun()
+            # A form holds back reruns until Save/Cancel is pressed
+            with st.form(f"rename_form_{cid}", border=False):
+                st.text_input(
+                    "New name",
+                    value=title[:MAX_TITLE_CHARS],
+                    max_chars=MAX_TITLE_CHARS,
+                    key=f"rename_input_{cid}",
+                    label_visibility="collapsed",
+                )
+                col_save, col_cancel = st.columns([1, 1])
+                with col_save:
+                    st.form_submit_button("💾 Save", use_container_width=True,
+                                          on_click=save_rename, args=(cid,))
+                with col_cancel:
+                    st.form_submit_button("✗ Cancel", use_container_width=True,
+                                          on_click=cancel_rename)
             st.markdown("---")
             continue
 
-        col1, col2 = st.columns([9, 1])
-        with col1:
-            is_selected = (cid == current)
-            if st.button(
-                title,
-                key=f"chat_{cid}",
-                use_container_width=True,
-                type="primary" if is_selected else "secondary",
-            ):
-                # If using PostgreSQL/Redis and messages aren't loaded, fetch them now
-                if CHAT_HISTORY_MODE in ["postgres", "local_psql", "redis", "local_redis"] and not convo.get("messages"):
-                    user_id = st.session_state.user_info.get('user_id')
-                    full_convo = HISTORY.get_conversation(cid, user_id=user_id)
-                    if full_convo:
-                        st.session_state.conversations[cid] = full_convo
-
+        if cid != current:
+            # Inactive chats are a single widget; options live on the active row
+            if st.button(title, key=f"chat_{cid}", use_container_width=True):
+                # Only the active chat keeps its messages in session memory
+                evict_messages(current)
                 st.session_state.current_id = cid
                 st.session_state.show_menu = None
                 st.rerun()
+            continue
+
+        col1, col2 = st.columns([9, 1])
+        with col1:
+            st.button(title, key=f"chat_{cid}", use_container_width=True, type="primary")
         with col2:
-            if st.button("⋮", key=f"menu_{cid}", help="Chat options"):
-                st.session_state.show_menu = None if st.session_state.show_menu == cid else cid
-                st.rerun()
+            st.button("⋮", key=f"menu_{cid}", help="Chat options",
+                      on_click=toggle_chat_menu, args=(cid,))
 
         if st.session_state.show_menu == cid:
             col_left, col_menu, col_right = st.columns([1, 2, 1])
             with col_menu:
-                if st.button("✏️ Rename", key=f"rename_btn_{cid}", use_container_width=True):
-                    st.session_state.renaming_chat = cid
-                    st.session_state.show_menu = None
-                    st.rerun()
+                st.button("✏️ Rename", key=f"rename_btn_{cid}", use_container_width=True,
+                          on_click=start_rename, args=(cid,))
                 if st.button("🗑️ Delete", key=f"delete_btn_{cid}", use_container_width=True):
-                    was_current = (cid == st.session_state.current_id)
-                    st.session_state.conversations.pop(cid, None)
-                    user_id = st.session_state.user_info.get('user_id')
-                    HISTORY.delete_conversation(cid, user_id=user_id)
+                    was_current = (cid == current)
+                    was_saved = (cid != st.session_state.get("empty_chat_id"))
+                    conversations.pop(cid, None)
+                    st.session_state.llm_messages.pop(cid, None)
+                    st.session_state.transcript_window.pop(cid, None)
+                    st.session_state.conv_order_dirty = True
+                    if was_saved:
+                        user_id = st.session_state.user_info.get('user_id')
+                        HISTORY.discard_pending(cid)
+                        HISTORY.delete_conversation(cid, user_id=user_id)
                     st.session_state.show_menu = None
                     st.session_state.renaming_chat = None
                     if was_current:
@@ -333,6 +463,10 @@ def render_chat_items() -> None:
                     st.rerun()
             st.markdown("---")
 
+    if len(conversations) > visible:
+        st.button("Load older", key="load_older_chats", use_container_width=True,
+                  on_click=load_older_chats)
+
 
 def render_user_info() -> None:
     """Render user information at the bottom of the sidebar."""
@@ -378,20 +512,28 @@ def render_sidebar() -> None:
         render_user_info()
 
 
+def show_earlier_messages(cid: str) -> None:
+    """Extend a conversation's rendered transcript by one page."""
+    window = st.session_state.transcript_window
+    window[cid] = window.get(cid, TRANSCRIPT_PAGE_SIZE) + TRANSCRIPT_PAGE_SIZE
+
+
 def render_transcript(convo: Dict) -> None:
-    """Render welcome screen or the chat transcript for the given conversation."""
-    if not convo["messages"]:
-        st.markdown(
-            f"""
-                <div style="display: flex; flex-direction: column; align-items: center; justify-content: center; height: 60vh;">
-                    <h1 style="text-align: center; margin-bottom: 1rem;">{WELCOME_TITLE}</h1>
-                    <p style="text-align: center; font-size: 1.2rem; color: #666;">{WELCOME_SUBTITLE}</p>
-                </div>
-            """,
-            unsafe_allow_html=True,
-        )
+    """Render welcome screen or the chat transcript for the given conversation.
+
+    Only the newest TRANSCRIPT_PAGE_SIZE messages are drawn until the user
+    asks for earlier ones, so long chats do not re-render their full history.
+    """
+    messages = convo["messages"]
+    if not messages:
+        st.markdown(WELCOME_HTML, unsafe_allow_html=True)
         return
-    for m in convo["messages"]:
+    cid = st.session_state.current_id
+    window = st.session_state.transcript_window.get(cid, TRANSCRIPT_PAGE_SIZE)
+    if len(messages) > window:
+        st.button("Load earlier messages", key=f"load_earlier_{cid}",
+                  on_click=show_earlier_messages, args=(cid,))
+    for m in messages[-window:]:
         with st.chat_message(m["role"]):
             st.markdown(m["content"])
 
@@ -401,42 +543,91 @@ def build_llm_messages(messages: List[Dict]) -> List[Dict]:
     return [{"role": m["role"], "content": m["content"]} for m in messages]
 
 
+def get_llm_messages(cid: str, convo: Dict) -> List[Dict]:
+    """Return the role/content-only message list kept alongside a conversation.
+
+    Built once per conversation and session, then appended to in step with
+    convo["messages"] so each turn avoids copying the whole history.
+    """
+    llm_messages = st.session_state.llm_messages.get(cid)
+    if llm_messages is None:
+        llm_messages = build_llm_messages(convo["messages"])
+        st.session_state.llm_messages[cid] = llm_messages
+    return llm_messages
+
+
 def handle_chat_input(convo: Dict) -> None:
     """Handle user input, append messages, call the LLM stub, and rerun."""
     prompt = st.chat_input("Message…")
     if not prompt:
         return
 
-    convo["messages"].append({"role": "user", "content": prompt, "time": datetime.now(timezone.utc).isoformat()})
+    # One timestamp for the whole exchange: both messages and last_modified
+    now = datetime.now(timezone.utc).isoformat()
+    llm_messages = get_llm_messages(st.session_state.current_id, convo)
+    convo["messages"].append({"role": "user", "content": prompt, "time": now})
+    llm_messages.append({"role": "user", "content": prompt})
+    if st.session_state.get("empty_chat_id") == st.session_state.current_id:
+        st.session_state.empty_chat_id = None
+    title_before = convo["title"]
     if convo["title"] == "New chat":
         convo["title"] = title_from_first_user_message(prompt)
 
     with st.chat_message("user"):
         st.markdown(prompt)
 
-    reply = call_llm_stub(convo["model"], build_llm_messages(convo["messages"]))
-    convo["messages"].append({"role": "assistant", "content": reply, "time": datetime.now(timezone.utc).isoformat()})
-    convo["last_modified"] = datetime.now(timezone.utc).isoformat()
+    reply = call_llm_stub(convo["model"], llm_messages, user_last=prompt)
+    convo["messages"].append({"role": "assistant", "content": reply, "time": now})
+    llm_messages.append({"role": "assistant", "content": reply})
+    convo["last_modified"] = now
+    # The sidebar only needs a full rerun if this chat's title or position changes
+    was_newest = next(reversed(st.session_state.conversations)) == st.session_state.current_id
+    sidebar_stale = convo["title"] != title_before or not was_newest
+    touch_conversation(st.session_state.current_id)
     with st.chat_message("assistant"):
         st.markdown(reply)
-    # Persist conversation after message exchange
+    # Persist only the new exchange plus metadata (this creates the chat on its first message)
     user_id = st.session_state.user_info.get('user_id')
-    HISTORY.save_conversation(st.session_state.current_id, convo, user_id=user_id)
-    st.rerun()
+    HISTORY.queue_append_messages(st.session_state.current_id, convo, convo["messages"][-2:], user_id=user_id)
+    if sidebar_stale:
+        st.rerun()
+
+
+def warn_write_error(cid: str) -> None:
+    """Toast once per error while this chat's saves are being retried."""
+    error = HISTORY.write_error(cid)
+    shown = st.session_state.write_errors_shown
+    if error and shown.get(cid) != error:
+        st.toast("Couldn't save recent messages; retrying in the background.", icon="⚠️")
+    if error:
+        shown[cid] = error
+    else:
+        shown.pop(cid, None)
 
 
 # ----------------------------------------------------------------------------
 # Main page orchestration
 # ----------------------------------------------------------------------------
+@st.fragment
+def render_conversation() -> None:
+    """Render the active transcript and chat input as a fragment.
+
+    Sending a message reruns only this fragment; the new turn is drawn inline,
+    so a full rerun is triggered only when the sidebar shows a new title or order.
+    """
+    current_convo = load_messages(st.session_state.current_id)
+    warn_write_error(st.session_state.current_id)
+    render_transcript(current_convo)
+    handle_chat_input(current_convo)
+
+
 def main() -> None:
     """Coordinate the full page lifecycle: state, UI, transcript, and input."""
     ensure_state()
     inject_css()
     render_sidebar()
     sync_selected_model_to_current()
-    current_convo = st.session_state.conversations[st.session_state.current_id]
-    render_transcript(current_convo)
-    handle_chat_input(current_convo)
+    render_conversation()
 
 
 main()
\ No newline at end of file
@@ -30,9 +30,12 @@ CREATE TABLE IF NOT EXISTS conversations (
     last_modified TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
--- Index for efficient user-scoped queries sorted by last_modified
-CREATE INDEX IF NOT EXISTS idx_conversations_user_modified
-    ON conversations (user_client_id, last_modified DESC);
+-- Covering index for user-scoped listings sorted by last_modified
+-- (index-only scan: includes every column the listing selects). The app caps
+-- titles at MAX_TITLE_CHARS so INCLUDE rows stay under the btree row limit.
+CREATE INDEX IF NOT EXISTS idx_conversations_user_modified_covering
+    ON conversations (user_client_id, last_modified DESC)
+    INCLUDE (created_at, conversation_id, title, model);
 
 -- Index for filtering by creation date (for N-day lookups)
 CREATE INDEX IF NOT EXISTS idx_conversations_user_created
@@ -0,0 +1,93 @@
+"""Tests for chat_history_manager (local mode; no database needed)."""
+import tempfile
+import unittest
+
+from chat_history_manager import ChatHistoryManager
+
+
+def exchange(convo, i):
+    """Append one user/assistant turn and return the two new messages."""
+    new = [
+        {"role": "user", "content": f"u{i}", "time": "2026-01-01T00:00:00+00:00"},
+        {"role": "assistant", "content": f"a{i}", "time": "2026-01-01T00:00:00+00:00"},
+    ]
+    for message in new:
+        convo["messages"].append(message)
+    return new
+
+
+class FailedAppendTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = ChatHistoryManager(mode="local", base_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.manager.close()
+        self.tmp.cleanup()
+
+    def fail_writes(self):
+        def fail(*args, **kwargs):
+            raise OSError("disk unavailable")
+
+        self.manager.append_messages = fail
+        self.manager.save_conversation = fail
+
+    def restore_writes(self):
+        del self.manager.append_messages
+        del self.manager.save_conversation
+
+    def stored_contents(self):
+        convo = ChatHistoryManager(mode="local", base_dir=self.tmp.name).get_conversation("c1")
+        return [message["content"] for message in convo["messages"]]
+
+    def test_resync_after_evict_and_reload_keeps_every_message(self):
+        manager = self.manager
+        convo = {
+            "title": "t", "model": "gpt-4o", "messages": [],
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "last_modified": "2026-01-01T00:00:00+00:00",
+        }
+        manager.queue_append_messages("c1", convo, exchange(convo, 0))
+        manager.flush_all()
+
+        self.fail_writes()
+        manager.queue_append_messages("c1", convo, exchange(convo, 1))
+        manager.flush_all()
+        self.assertEqual(manager.write_error("c1"), "disk unavailable")
+
+        # Switching away evicts the messages; reopening the chat reloads them
+        reloaded = manager.get_conversation("c1")
+        self.assertEqual(len(reloaded["messages"]), 4)
+        manager.queue_append_messages("c1", reloaded, exchange(reloaded, 2))
+
+        self.restore_writes()
+        manager.flush_all()
+        self.assertIsNone(manager.write_error("c1"))
+        self.assertEqual(self.stored_contents(), ["u0", "a0", "u1", "a1", "u2", "a2"])
+
+    def test_buffered_messages_appended_after_queueing_are_written_once(self):
+        manager = self.manager
+        convo = {
+            "title": "t", "model": "gpt-4o", "messages": [],
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "last_modified": "2026-01-01T00:00:00+00:00",
+        }
+        manager.queue_append_messages("c1", convo, exchange(convo, 0))
+        manager.flush_all()
+        # Reopened from disk: messages are buffered from the JSONL file
+        convo = manager.get_conversation("c1")
+
+        self.fail_writes()
+        manager.queue_append_messages("c1", convo, exchange(convo, 1))
+        manager.flush_all()
+        # The caller keeps appending to the same sequence before the resync
+        new = exchange(convo, 2)
+        self.restore_writes()
+        manager.flush_all()
+        manager.queue_append_messages("c1", convo, new)
+        manager.flush_all()
+        self.assertEqual(self.stored_contents(), ["u0", "a0", "u1", "a1", "u2", "a2"])
+
+
+if __name__ == "__main__":
+    unittest.main()